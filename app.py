@@ -4,88 +4,164 @@
 # Copy this file to your project root and run: `streamlit run app.py`
 
 import os
+import csv
 import streamlit as st
 import requests
-from textblob import TextBlob
-from deep_translator import GoogleTranslator
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 import pytz
 import re
-
-# Optional RSS fallback (feedparser helps if NewsAPI fails)
-try:
-    import feedparser
-except Exception:
-    feedparser = None
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ---------------- CONFIG ----------------
 NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY", "") or "638626e0c8e24c2c8b074ddea1768e4d"
 FEEDBACK_CSV = "feedback_store.csv"
+FEEDBACK_COLS = ["Article", "Title", "Feedback", "Time", "Source", "URL"]
 india = pytz.timezone("Asia/Kolkata")
 
+# Precompiled patterns used by the text helpers (avoid per-call compilation / cache lookups)
+_WS_RE = re.compile(r"\s+")
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+_CLICKBAIT_RE = re.compile(r"(shocking|miracle|unbelievable|guaranteed|scandal)")
+_RESEARCH_RE = re.compile(r"research|study|report|official")
+_DIGIT_RE = re.compile(r"\d")
+
+# Trusted source names, pre-lowered for substring matching against the article source
+_TRUSTED_LOWER = tuple(t.lower() for t in [
+    "BBC", "NDTV", "The Hindu", "Times of India", "CNN",
+    "Google News", "Reuters", "Al Jazeera", "Washington Post", "Indian Express"
+])
+
 # ---------------- SESSION STATE ----------------
-if "feedback_store" not in st.session_state:
+if "feedback_rows" not in st.session_state:
+    # Feedback is kept as a list of row dicts (O(1) append); DataFrames are built only for display.
     # Try to load existing CSV; if columns differ or file missing, normalize to expected schema.
-    expected_cols = ["Article", "Title", "Feedback", "Time", "Source", "URL"]
+    rows = []
     if os.path.exists(FEEDBACK_CSV):
         try:
             df = pd.read_csv(FEEDBACK_CSV)
             # Ensure all expected columns exist
-            for c in expected_cols:
+            for c in FEEDBACK_COLS:
                 if c not in df.columns:
                     df[c] = ""
-            df = df[expected_cols]
-            st.session_state.feedback_store = df
+            rows = df[FEEDBACK_COLS].to_dict("records")
         except Exception:
-            st.session_state.feedback_store = pd.DataFrame(columns=expected_cols)
-    else:
-        st.session_state.feedback_store = pd.DataFrame(columns=expected_cols)
+            rows = []
+    st.session_state.feedback_rows = rows
 
 
 # ---------------- HELPERS ----------------
+def feedback_df():
+    """Materialize the session feedback rows as a DataFrame with the expected columns."""
+    return pd.DataFrame(st.session_state.feedback_rows, columns=FEEDBACK_COLS)
+
+
+def append_feedback_csv(row):
+    """Append a single feedback row to FEEDBACK_CSV.
+    Writes the header for a new file; if an existing file has a different header (older schema),
+    rewrites it once from the session rows (which already include `row`) so columns stay aligned."""
+    header = None
+    if os.path.exists(FEEDBACK_CSV):
+        with open(FEEDBACK_CSV, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), None)
+    if header is not None and header != FEEDBACK_COLS:
+        feedback_df().to_csv(FEEDBACK_CSV, index=False)
+        return
+    with open(FEEDBACK_CSV, "a", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=FEEDBACK_COLS)
+        if header is None:
+            w.writeheader()
+        w.writerow(row)
+
+
 def now_ist_string():
     return datetime.now(india).strftime("%A, %d %B %Y   |   %I:%M %p")
 
 
-def fetch_news_api(keyword, category, page_size):
-    """Fetch using NewsAPI (top-headlines or everything)."""
-    if not NEWSAPI_KEY:
-        return []
+# Heavy NLP / feed modules are imported on first use so the feedback and analytics pages start fast.
+def _load_feedparser():
+    """Optional RSS fallback (feedparser helps if NewsAPI fails). Returns None if it is not installed."""
+    try:
+        import feedparser
+    except Exception:
+        return None
+    return feedparser
+
+
+@st.cache_resource
+def _sentiment_analyzer():
+    """Lexicon-based sentiment analyzer, built once (much cheaper per call than TextBlob's pattern analyzer)."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+@st.cache_resource
+def _http_session():
+    """Shared HTTP session (kept across reruns) so repeated NewsAPI calls reuse keep-alive connections."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_news_api_cached(keyword, category, page_size):
+    # Raises on network errors or a non-"ok" status so failed requests are not cached.
     url = "https://newsapi.org/v2/top-headlines" if not keyword else "https://newsapi.org/v2/everything"
     params = {"apiKey": NEWSAPI_KEY, "pageSize": page_size, "language": "en"}
     if keyword:
         params["q"] = keyword
     if category and category != "All":
         params["category"] = category.lower()
+    resp = _http_session().get(url, params=params, timeout=8)
+    resp.raise_for_status()
+    r = resp.json()
+    if r.get("status") != "ok":
+        raise RuntimeError(f"NewsAPI returned status {r.get('status')!r}")
+    out = []
+    for a in r.get("articles", []):
+        out.append({
+            "title": a.get("title"),
+            "url": a.get("url"),
+            "source": a.get("source", {}).get("name"),
+            "publishedAt": a.get("publishedAt"),
+            "description": a.get("description"),
+            "content": a.get("content")
+        })
+    return out
+
+
+def fetch_news_api(keyword, category, page_size):
+    """Fetch using NewsAPI (top-headlines or everything)."""
+    if not NEWSAPI_KEY:
+        return []
     try:
-        resp = requests.get(url, params=params, timeout=8)
-        resp.raise_for_status()
-        r = resp.json()
-        if r.get("status") != "ok":
-            return []
-        out = []
-        for a in r.get("articles", []):
-            out.append({
-                "title": a.get("title"),
-                "url": a.get("url"),
-                "source": a.get("source", {}).get("name"),
-                "publishedAt": a.get("publishedAt"),
-                "description": a.get("description"),
-                "content": a.get("content")
-            })
-        return out
+        return _fetch_news_api_cached(keyword, category, page_size)
     except Exception:
         return []
 
 
-def fetch_news_rss(sources, max_items=10):
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_news_rss_cached(sources, max_items):
+    # Raises when no feed yields entries so an empty result is not cached.
+    feedparser = _load_feedparser()
+
+    def _parse(s):
+        try:
+            return feedparser.parse(s)
+        except Exception:
+            return None
+
+    # Fetch all feeds concurrently so total latency is the slowest feed, not the sum.
+    with ThreadPoolExecutor(max_workers=len(sources)) as ex:
+        feeds = list(ex.map(_parse, sources))
     out = []
-    if not feedparser:
-        return out
-    for s in sources:
+    for feed in feeds:
+        if feed is None:
+            continue
         try:
-            feed = feedparser.parse(s)
             for e in feed.entries[:max_items]:
                 out.append({
                     "title": e.get("title"),
@@ -97,57 +173,87 @@ def fetch_news_rss(sources, max_items=10):
                 })
         except Exception:
             continue
+    if not out:
+        raise RuntimeError("No RSS entries fetched")
     return out
 
 
+def fetch_news_rss(sources, max_items=10):
+    """Fetch entries from RSS feeds. `sources` should be a tuple so results can be cached per argument set."""
+    if not _load_feedparser() or not sources:
+        return []
+    try:
+        return _fetch_news_rss_cached(sources, max_items)
+    except Exception:
+        return []
+
+
+# The summary / sentiment / credibility helpers only run on a Fetch, so their caches pay off when the same
+# articles are fetched again (e.g. a repeat Fetch within the 5-minute fetch cache), not on other widget reruns.
+# st.cache_data rather than functools.lru_cache: Streamlit re-executes this script on every rerun.
+@st.cache_data(max_entries=512, show_spinner=False)
 def summarize_text_five_lines(text):
     """Return up to 5 sentences (approx 5 lines). If sentence splitting fails, fall back to first ~60-120 words."""
     if not text:
         return "No content available."
     # Normalize whitespace and replace newlines
-    text = re.sub(r"\s+", " ", text).strip()
-    # Split into sentences using punctuation.
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    text = _WS_RE.sub(" ", text).strip()
+    # Split into sentences using punctuation, stopping after 5 so long articles are not fully split.
+    sentences = []
+    last = 0
+    for m in _SENT_RE.finditer(text):
+        s = text[last:m.start()].strip()
+        if s:
+            sentences.append(s)
+        last = m.end()
+        if len(sentences) == 5:
+            break
+    else:
+        s = text[last:].strip()
+        if s:
+            sentences.append(s)
     if len(sentences) == 0:
         # fallback to word-based summary
         words = text.split()
         return " ".join(words[:80]) + (" ..." if len(words) > 80 else "")
     # join up to 5 sentences
-    summary = " ".join(sentences[:5])
+    summary = " ".join(sentences)
     # if summary is still extremely long, trim words to ~120 words
-    words = summary.split()
+    words = summary.split(None, 120)
     if len(words) > 120:
         summary = " ".join(words[:120]) + " ..."
     return summary
 
 
+@st.cache_data(max_entries=512, show_spinner=False)
 def get_sentiment_label(text):
     if not text:
         return "Neutral 😐"
     try:
-        p = TextBlob(text).sentiment.polarity
-        return "Positive 😊" if p > 0 else ("Negative 😡" if p < 0 else "Neutral 😐")
+        c = _sentiment_analyzer().polarity_scores(text)["compound"]
+        return "Positive 😊" if c > 0.05 else ("Negative 😡" if c < -0.05 else "Neutral 😐")
     except Exception:
         return "Neutral 😐"
 
 
+@st.cache_data(max_entries=512, show_spinner=False)
 def fake_news_check(title, text, source):
     score = 50
-    trusted = [
-        "BBC", "NDTV", "The Hindu", "Times of India", "CNN",
-        "Google News", "Reuters", "Al Jazeera", "Washington Post", "Indian Express"
-    ]
-    if source and any(t.lower() in (source or "").lower() for t in trusted):
+    src_low = (source or "").lower()
+    if src_low and any(t in src_low for t in _TRUSTED_LOWER):
         score += 30
-    if text and len(text.split()) > 120:
-        score += 15
-    if text and any(w in text.lower() for w in ["research", "study", "report", "official"]):
-        score += 10
-    if text and any(ch.isdigit() for ch in text):
-        score += 5
-    if text and re.search(r"(shocking|miracle|unbelievable|guaranteed|scandal)", text.lower()):
-        score -= 25
+    # text heuristics are skipped entirely for empty text; lower-case it once otherwise
+    if text:
+        text_low = text.lower()
+        # bounded split: only need to know whether there are more than 120 words
+        if len(text.split(None, 120)) > 120:
+            score += 15
+        if _RESEARCH_RE.search(text_low):
+            score += 10
+        if _DIGIT_RE.search(text):
+            score += 5
+        if _CLICKBAIT_RE.search(text_low):
+            score -= 25
     score = max(0, min(100, score))
     if score >= 80:
         return f"🟢 Real News ({score}% confidence)"
@@ -156,56 +262,97 @@ def fake_news_check(title, text, source):
     return f"🔴 Fake News Likely ({score}% confidence)"
 
 
+@st.cache_resource
+def _translation_executor():
+    """Long-lived worker pool for translate_batch, so per-thread translators survive across fetches and reruns."""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="translate")
+
+
+@st.cache_resource
+def _translator_slots(target):
+    # GoogleTranslator.translate mutates instance state before each request, so instances must not be
+    # shared between the translation worker threads; keep one per thread for each target language.
+    return threading.local()
+
+
+def _get_translator(target):
+    """Return a reusable GoogleTranslator for `target` (one per target language and thread)."""
+    slots = _translator_slots(target)
+    translator = getattr(slots, "translator", None)
+    if translator is None:
+        from deep_translator import GoogleTranslator
+        translator = slots.translator = GoogleTranslator(source="auto", target=target)
+    return translator
+
+
+def _translate_uncached(text, target):
+    return _get_translator(target).translate(text)
+
+
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def _translate_cached(text, target):
+    # Exceptions propagate so failed translations are not cached.
+    return _translate_uncached(text, target)
+
+
 def translate_text(text, lang):
     lang_map = {"English": "en", "Kannada": "kn", "Hindi": "hi", "Tamil": "ta", "Malayalam": "ml", "Telugu": "te"}
     if not text:
         return ""
     try:
-        return GoogleTranslator(source="auto", target=lang_map.get(lang, "en")).translate(text)
+        return _translate_cached(text, lang_map.get(lang, "en"))
     except Exception:
         return "Translation error"
 
 
+def translate_batch(texts, lang):
+    """Translate a list of texts in one step, preserving order. Each distinct text is translated once,
+    and the distinct texts are sent concurrently on the shared translation pool (each request goes
+    through the translation cache)."""
+    unique = list(dict.fromkeys(t for t in texts if t))
+    if not unique:
+        return ["" for _ in texts]
+    done = dict(zip(unique, _translation_executor().map(lambda t: translate_text(t, lang), unique)))
+    return [done.get(t, "") for t in texts]
+
+
 def parse_publish_time(raw):
     """Parse ISO-like time returned by NewsAPI. If parsing fails, return the original string if it looks like a readable date,
     otherwise return current IST time. This avoids overriding valid published timestamps with 'now'."""
     if not raw:
         return datetime.now(india).strftime("%d-%m-%Y %I:%M %p")
     s = str(raw).strip()
-    # Common ISO 8601 with Z or timezone e.g. 2025-12-01T12:34:56Z
+    # ISO 8601 as returned by NewsAPI, e.g. 2025-12-01T12:34:56Z (naive values are assumed UTC)
     try:
-        # Remove timezone 'Z' if present
-        if s.endswith("Z"):
-            s2 = s[:-1]
-            dt = datetime.strptime(s2[:19], "%Y-%m-%dT%H:%M:%S")
-            dt = pytz.utc.localize(dt).astimezone(india)
-            return dt.strftime("%d-%m-%Y %I:%M %p")
-        # If contains + or - timezone part, try to cut
-        if "T" in s and ("+" in s or "-" in s[10:]):
-            # take first 19 chars
-            s2 = s[:19]
-            dt = datetime.strptime(s2, "%Y-%m-%dT%H:%M:%S")
-            dt = pytz.utc.localize(dt).astimezone(india)
-            return dt.strftime("%d-%m-%Y %I:%M %p")
-        # Try ISO without timezone
-        if "T" in s:
-            s2 = s[:19]
-            dt = datetime.strptime(s2, "%Y-%m-%dT%H:%M:%S")
-            dt = pytz.utc.localize(dt).astimezone(india)
-            return dt.strftime("%d-%m-%Y %I:%M %p")
-    except Exception:
-        pass
-    # If looks like a normal human date string, try to parse generic patterns
-    try:
-        # Many RSS feeds may pass a string like 'Mon, 01 Dec 2025 03:06:00 GMT'
-        # We'll try common format:
-        dt = datetime.strptime(s[:25], "%a, %d %b %Y %H:%M:%S")
-        # assume UTC -> IST
-        dt = pytz.utc.localize(dt).astimezone(india)
-        return dt.strftime("%d-%m-%Y %I:%M %p")
-    except Exception:
-        # final fallback: return current IST so displayed items are not misleadingly old
-        return datetime.now(india).strftime("%d-%m-%Y %I:%M %p")
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        # RFC 822 dates used by RSS feeds, e.g. 'Mon, 01 Dec 2025 03:06:00 GMT'
+        try:
+            dt = parsedate_to_datetime(s)
+        except (TypeError, ValueError):
+            # final fallback: return current IST so displayed items are not misleadingly old
+            return datetime.now(india).strftime("%d-%m-%Y %I:%M %p")
+    if dt.tzinfo is None:
+        dt = pytz.utc.localize(dt)
+    return dt.astimezone(india).strftime("%d-%m-%Y %I:%M %p")
+
+
+def process_article(art):
+    """Run the per-article NLP (summary, sentiment, credibility) and return display fields.
+    Renders nothing itself; the helpers it calls are memoized with st.cache_data / st.cache_resource."""
+    title = art.get("title") or "No title"
+    src = art.get("source") or "Unknown"
+    text = art.get("content") or art.get("description") or ""
+    summary = summarize_text_five_lines(text)
+    return {
+        "title": title,
+        "source": src,
+        "url": art.get("url") or "",
+        "published": parse_publish_time(art.get("publishedAt") or art.get("published") or ""),
+        "summary": summary,
+        "sentiment": get_sentiment_label(text),
+        "credibility": fake_news_check(title, text, src),
+    }
 
 
 # ---------------- UI ----------------
@@ -228,16 +375,18 @@ page = st.sidebar.radio("", ["Home", "View All Feedback", "Analytics"])
 
 st.sidebar.markdown("---")
 st.sidebar.title("Recent Feedback (live)")
-if st.session_state.feedback_store.empty:
+if not st.session_state.feedback_rows:
     st.sidebar.info("No feedback yet.")
 else:
-    last = st.session_state.feedback_store.tail(6).iloc[::-1]
-    for _, row in last.iterrows():
+    # build all recent entries into one markdown block (one sidebar element instead of six)
+    entries = []
+    for row in st.session_state.feedback_rows[-6:][::-1]:
         # guard against missing columns
-        art = int(row["Article"]) if "Article" in row and str(row["Article"]).isdigit() else ""
+        art = int(row["Article"]) if str(row.get("Article", "")).isdigit() else ""
         t = str(row.get("Time", ""))[:40]
         fb = str(row.get("Feedback", ""))[:120]
-        st.sidebar.info(f"Article {art} • {t}\n{fb}")
+        entries.append(f"**Article {art}** • {t}\n\n{fb}")
+    st.sidebar.markdown("\n\n---\n\n".join(entries))
 
 st.sidebar.markdown("---")
 st.sidebar.caption("Built for: AI news summarizer & fake-news detection")
@@ -254,18 +403,18 @@ if page == "Home":
             fetch_btn = st.button("Fetch Latest Articles")
         with col2:
             st.write("")  # spacing
-            st.metric("Total feedback collected", len(st.session_state.feedback_store))
+            st.metric("Total feedback collected", len(st.session_state.feedback_rows))
 
     if fetch_btn:
         articles = fetch_news_api(keyword, category, page_size)
         if not articles:
             # fallback to RSS if feedparser available
-            if feedparser:
-                rss_sources = [
+            if _load_feedparser():
+                rss_sources = (
                     "https://feeds.reuters.com/reuters/topNews",
                     "https://rss.cnn.com/rss/edition.rss",
                     "https://feeds.bbci.co.uk/news/rss.xml"
-                ]
+                )
                 articles = fetch_news_rss(rss_sources, max_items=page_size)
             else:
                 st.error("No NewsAPI key / response and feedparser not available for RSS fallback.")
@@ -274,25 +423,25 @@ if page == "Home":
         if not articles:
             st.error("No articles found. Try different keyword or increase number of articles.")
         else:
-            for i, art in enumerate(articles):
-                title = art.get("title") or "No title"
-                src = art.get("source") or "Unknown"
-                url = art.get("url") or ""
-                published_raw = art.get("publishedAt") or art.get("published") or ""
-                published = parse_publish_time(published_raw)
+            # Per-article NLP is CPU-bound (threads would only contend on the GIL), so run it inline;
+            # the network-bound translation of all summaries is done concurrently in one batch.
+            results = [process_article(a) for a in articles]
+            translations = translate_batch([res["summary"] for res in results], lang)
+
+            for i, (res, translated) in enumerate(zip(results, translations)):
+                title = res["title"]
+                src = res["source"]
+                url = res["url"]
 
                 st.markdown(f"### {i+1}. {title}")
-                st.markdown(f"**Source:** {src}  •  **Published:** {published} IST")
+                st.markdown(f"**Source:** {src}  •  **Published:** {res['published']} IST")
                 if url:
                     st.markdown(f"[Read full article]({url})")
 
-                text = art.get("content") or art.get("description") or ""
-                summary = summarize_text_five_lines(text)
-                st.info(f"📝 Summary:\n{summary}")
-                translated = translate_text(summary, lang)
+                st.info(f"📝 Summary:\n{res['summary']}")
                 st.success(f"🌐 Translated summary ({lang}):\n{translated}")
-                st.warning("🧠 Sentiment: " + get_sentiment_label(text))
-                st.markdown(f"**🔍 Credibility:** {fake_news_check(title, text, src)}")
+                st.warning("🧠 Sentiment: " + res["sentiment"])
+                st.markdown(f"**🔍 Credibility:** {res['credibility']}")
 
                 # feedback form (use st.form for reliability)
                 form_key = f"form_{i}"
@@ -314,19 +463,9 @@ if page == "Home":
                                 "URL": url
                             }
                             # append to session store and persist
-                            st.session_state.feedback_store = pd.concat(
-                                [st.session_state.feedback_store, pd.DataFrame([new_row])],
-                                ignore_index=True
-                            )
+                            st.session_state.feedback_rows.append(new_row)
                             try:
-                                # Ensure columns and save
-                                cols = ["Article", "Title", "Feedback", "Time", "Source", "URL"]
-                                df_to_save = st.session_state.feedback_store.copy()
-                                for c in cols:
-                                    if c not in df_to_save.columns:
-                                        df_to_save[c] = ""
-                                df_to_save = df_to_save[cols]
-                                df_to_save.to_csv(FEEDBACK_CSV, index=False)
+                                append_feedback_csv(new_row)
                                 st.success("✅ Feedback saved and visible in sidebar")
                                 # small UX improvement: refresh sidebar display (Streamlit will reflect session_state changes)
                             except Exception:
@@ -337,28 +476,24 @@ if page == "Home":
 # ---------------- VIEW ALL FEEDBACK ----------------
 if page == "View All Feedback":
     st.title("📁 All Submitted Feedback")
-    df = st.session_state.feedback_store.copy()
-    if df.empty:
+    if not st.session_state.feedback_rows:
         st.info("No feedback yet. Go to Home and submit feedback.")
     else:
-        # Ensure expected columns exist
-        expected_cols = ["Article", "Title", "Feedback", "Time", "Source", "URL"]
-        for c in expected_cols:
-            if c not in df.columns:
-                df[c] = ""
-        df_display = df[expected_cols].sort_values(by="Time", ascending=False).reset_index(drop=True)
+        # rows are stored in submission order, so newest-first is just a reversal
+        # (the "Time" strings do not sort chronologically anyway)
+        df_display = pd.DataFrame(st.session_state.feedback_rows[::-1], columns=FEEDBACK_COLS)
         st.dataframe(df_display)
 
 
 # ---------------- ANALYTICS ----------------
 if page == "Analytics":
     st.title("📊 Feedback Analytics")
-    df = st.session_state.feedback_store
+    df = feedback_df()
     if df.empty:
         st.info("No feedback to analyze yet.")
     else:
-        counts = df["Article"].value_counts().sort_index()
-        chart_df = pd.DataFrame({"article_index": counts.index.astype(str), "feedback_count": counts.values})
-        st.bar_chart(data=chart_df.set_index("article_index"))
+        counts = df["Article"].value_counts(sort=False).sort_index()
+        counts.index = counts.index.astype(str)
+        st.bar_chart(counts)
         st.write("Last 10 feedback entries:")
         st.table(df.tail(10).iloc[::-1].reset_index(drop=True))